@@ -1,6 +1,11 @@
 import os
 import sys
 import re
+import string
+import hashlib
+import tempfile
+import functools
+import concurrent.futures
 from pathlib import Path
 from difflib import SequenceMatcher
 
@@ -8,19 +13,101 @@ try:
     import pytesseract
     from pdf2image import convert_from_path
     from PIL import Image
-    import PyPDF2
+    import pypdfium2
 except ImportError:
     print("Errore: librerie mancanti. Installa con:")
-    print("pip install pytesseract pdf2image pillow PyPDF2")
+    print("pip install pytesseract pdf2image pillow pypdfium2")
     sys.exit(1)
 
+# Opzionale: rapidfuzz implementa lo stesso confronto in C++ (10-100x più
+# veloce di difflib); senza, si ricade sul SequenceMatcher standard
+try:
+    from rapidfuzz import fuzz as _fuzz
+except ImportError:
+    _fuzz = None
+
+# Pattern compilati una volta sola: vengono usati su ogni linea/frase di ogni
+# pagina, e ricompilare (o anche solo cercare nella cache di re) a ogni
+# chiamata costa più del match stesso
+_RE_DECORAZIONI = re.compile(r'[•◦▪▫●○■□★☆♦♣♠♥]')
+_RE_NUM_PAGINA = re.compile(r'^[\d\s\-/]+$')
+_RE_HEADER_FOOTER = re.compile(r'(Andrea Asperti.*Università.*Bologna.*DISI)', re.IGNORECASE)
+_RE_RUMORE_OCR = re.compile(r'[^\w\s]{5,}')
+_RE_ARTEFATTI = re.compile(r'^[\s\|\-_=~`]{3,}$')
+_RE_SPECIALE_DOPPIO = re.compile(r'([^\w\s])\1')
+_RE_SPAZI_MULTIPLI = re.compile(r'\s+')
+_RE_SPAZIO_PRIMA_PUNT = re.compile(r'\s+([.,;:!?])')
+_RE_SPAZIO_DOPO_PUNT = re.compile(r'([.,;:!?])([A-Za-zÀ-ÿ0-9])')
+_RE_PARENTESI_APERTA = re.compile(r'\(\s+')
+_RE_PARENTESI_CHIUSA = re.compile(r'\s+\)')
+_RE_CARATTERI_CONTROLLO = re.compile(r'[\x00-\x08\x0b-\x0c\x0e-\x1f\x7f]')
+_RE_CIFRE = re.compile(r'(\d+)')
+
+# Caratteri considerati "validi" da is_frase_valida: lettere e cifre (ASCII e
+# accentate latine), spazi, punteggiatura e simboli matematici comuni.
+# La tabella li elimina, così il conteggio avviene in C via str.translate
+# invece che con un ciclo Python carattere per carattere
+_CARATTERI_VALIDI = (
+    string.ascii_letters + string.digits + string.whitespace
+    + '.,;:!?()+-*/=<>[]{}^_'
+    + 'αβγδεθλμπστφωΣΔΦΩ±×÷≈≠≤≥∞∂∇∫√'
+    + ''.join(chr(c) for c in range(0xAA, 0x100) if chr(c).isalnum())
+)
+_TAB_RIMUOVI_VALIDI = str.maketrans('', '', _CARATTERI_VALIDI)
+
+# Cache su disco del testo pulito: rielaborare gli stessi PDF è il caso
+# comune e la pulizia è deterministica rispetto al testo in ingresso.
+# Incrementare la versione quando cambia la logica di pulizia
+_CACHE_DIR = Path(os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache')) / 'extracttext'
+_CACHE_VERSIONE = '3'
+
+@functools.lru_cache(maxsize=4096)
 def pulisci_testo_ocr(testo):
+    """Come _pulisci_testo_ocr, ma memoizzata: in memoria per i testi ripetuti
+    nella stessa esecuzione, su disco per le riesecuzioni su PDF invariati."""
+    if not testo:
+        return ""
+
+    chiave = hashlib.blake2b(
+        (_CACHE_VERSIONE + '\x00' + testo).encode('utf-8'),
+        digest_size=16
+    ).hexdigest()
+    percorso = _CACHE_DIR / chiave
+
+    try:
+        return percorso.read_text(encoding='utf-8')
+    except OSError:
+        pass
+
+    risultato = _pulisci_testo_ocr(testo)
+
+    try:
+        _CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+        # Scrittura atomica: i worker paralleli leggono e scrivono le stesse
+        # voci (header/footer identici tra deck), quindi si scrive su un nome
+        # temporaneo e si fa os.replace, così un lettore concorrente non può
+        # mai vedere una voce vuota o troncata
+        fd, percorso_tmp = tempfile.mkstemp(dir=_CACHE_DIR, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(risultato)
+            os.replace(percorso_tmp, percorso)
+        except OSError:
+            os.unlink(percorso_tmp)
+            raise
+    except OSError:
+        pass  # la cache è solo un'ottimizzazione: senza disco si ricalcola
+
+    return risultato
+
+def _pulisci_testo_ocr(testo):
     """Rimuove rumore e artefatti comuni dall'OCR, ma mantiene contenuto tecnico."""
     if not testo:
         return ""
     
     # Rimuovi solo caratteri decorativi (mantieni simboli matematici)
-    testo = re.sub(r'[•◦▪▫●○■□★☆♦♣♠♥]', '', testo)
+    testo = _RE_DECORAZIONI.sub('', testo)
     
     # Rimuovi linee con solo caratteri strani o troppo corte
     linee = testo.split('\n')
@@ -34,11 +121,11 @@ def pulisci_testo_ocr(testo):
             continue
         
         # Salta solo linee che sono SOLO numeri di pagina o date
-        if re.match(r'^[\d\s\-/]+$', linea) and len(linea) < 15:
+        if _RE_NUM_PAGINA.match(linea) and len(linea) < 15:
             continue
         
         # Salta linee con pattern tipici di header/footer ripetitivi
-        if re.search(r'(Andrea Asperti.*Università.*Bologna.*DISI)', linea, re.IGNORECASE):
+        if _RE_HEADER_FOOTER.search(linea):
             continue
         
         # Salta linee che sono solo una singola parola ripetuta più volte
@@ -47,34 +134,34 @@ def pulisci_testo_ocr(testo):
             continue
         
         # Salta linee con troppi caratteri strani consecutivi (rumore OCR)
-        if re.search(r'[^\w\s]{5,}', linea):
+        if _RE_RUMORE_OCR.search(linea):
             continue
         
         # Salta linee che sembrano solo artefatti (es: "| | | |" o "---___")
-        if re.match(r'^[\s\|\-_=~`]{3,}$', linea):
+        if _RE_ARTEFATTI.match(linea):
             continue
         
         linee_pulite.append(linea)
     
     testo = ' '.join(linee_pulite)
-    
+
     # Normalizza spazi multipli
-    testo = re.sub(r'\s+', ' ', testo)
-    
+    testo = _RE_SPAZI_MULTIPLI.sub(' ', testo)
+
     # Correggi spazi prima della punteggiatura
-    testo = re.sub(r'\s+([.,;:!?])', r'\1', testo)
-    
+    testo = _RE_SPAZIO_PRIMA_PUNT.sub(r'\1', testo)
+
     # Aggiungi spazio dopo la punteggiatura se mancante
-    testo = re.sub(r'([.,;:!?])([A-Za-zÀ-ÿ0-9])', r'\1 \2', testo)
-    
+    testo = _RE_SPAZIO_DOPO_PUNT.sub(r'\1 \2', testo)
+
     # Rimuovi spazi extra nelle parentesi
-    testo = re.sub(r'\(\s+', '(', testo)
-    testo = re.sub(r'\s+\)', ')', testo)
-    
+    testo = _RE_PARENTESI_APERTA.sub('(', testo)
+    testo = _RE_PARENTESI_CHIUSA.sub(')', testo)
+
     # Pulisci caratteri Unicode strani ma mantieni quelli matematici comuni
     # Mantieni: α β γ δ ε θ λ μ π σ τ φ ω Σ Δ Φ Ω ± × ÷ ≈ ≠ ≤ ≥ ∞ ∂ ∇ ∫ √
-    testo = re.sub(r'[\x00-\x08\x0b-\x0c\x0e-\x1f\x7f]', '', testo)
-    
+    testo = _RE_CARATTERI_CONTROLLO.sub('', testo)
+
     return testo.strip()
 
 def estrai_testo_per_pagina_pdf(pdf_path):
@@ -83,49 +170,136 @@ def estrai_testo_per_pagina_pdf(pdf_path):
     
     try:
         testi_per_pagina = []
-        
-        with open(pdf_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            
-            for pagina_num in range(len(pdf_reader.pages)):
-                pagina = pdf_reader.pages[pagina_num]
-                testo = pagina.extract_text()
-                
+
+        # pypdfium2 (wrapper di PDFium in C++) estrae il testo molto più
+        # velocemente del vecchio PyPDF2 puro-Python e rilascia il GIL
+        pdf = pypdfium2.PdfDocument(str(pdf_path))
+        try:
+            for pagina in pdf:
+                textpage = pagina.get_textpage()
+                testo = textpage.get_text_range()
+                textpage.close()
+                pagina.close()
+
                 testo_pulito = pulisci_testo_ocr(testo) if testo else ""
                 testi_per_pagina.append(testo_pulito)
-        
+        finally:
+            pdf.close()
+
         return testi_per_pagina
-    
+
     except Exception as e:
         print(f"  ⚠ Errore estrazione nativa: {e}")
         return []
 
+def _similarita_normalizzata(testo1, testo2):
+    """Similarità (0-1) tra testi già in minuscolo: i chiamanti che
+    normalizzano le frasi una volta sola evitano di ri-abbassare le stesse
+    stringhe a ogni confronto."""
+    if not testo1 or not testo2:
+        return 0.0
+
+    # score_cutoff consente a rapidfuzz di abbandonare presto i confronti
+    # sotto la soglia minima usata dai chiamanti (0.8)
+    if _fuzz is not None:
+        return _fuzz.ratio(testo1, testo2, score_cutoff=80.0) / 100.0
+
+    sm = SequenceMatcher(None, testo1, testo2)
+
+    # real_quick_ratio (solo lunghezze) e quick_ratio (conteggio caratteri)
+    # sono limiti superiori di ratio: se stanno sotto la soglia più bassa
+    # usata dai chiamanti (0.8) possiamo evitare il confronto completo O(n*m)
+    if sm.real_quick_ratio() < 0.8:
+        return 0.0
+    if sm.quick_ratio() < 0.8:
+        return 0.0
+
+    return sm.ratio()
+
 def calcola_similarita(testo1, testo2):
     """Calcola la similarità tra due testi (0-1)."""
     if not testo1 or not testo2:
         return 0.0
-    return SequenceMatcher(None, testo1.lower(), testo2.lower()).ratio()
+    return _similarita_normalizzata(testo1.lower(), testo2.lower())
+
+def _numero_worker_ocr():
+    """Numero di processi OCR paralleli (sovrascrivibile con OCR_CONCURRENCY)."""
+    try:
+        workers = int(os.environ.get('OCR_CONCURRENCY', '0'))
+    except ValueError:
+        workers = 0
+
+    if workers > 0:
+        return workers
+    return os.cpu_count() or 1
+
+def _ocr_pagina(img_path):
+    """Esegue l'OCR sull'immagine di una pagina (eseguito in un processo worker)."""
+    testo = pytesseract.image_to_string(img_path, lang='ita')
+
+    # Pagina già letta: eliminala subito, così lo spazio temporaneo occupato
+    # resta proporzionale alle pagine in volo e non all'intero documento
+    try:
+        os.unlink(img_path)
+    except OSError:
+        pass  # la TemporaryDirectory fa comunque pulizia alla fine
+
+    return pulisci_testo_ocr(testo)
 
 def estrai_testo_ocr_per_pagina(pdf_path):
-    """Applica OCR pagina per pagina."""
+    """Applica OCR pagina per pagina, in parallelo su più processi."""
     print(f"  Applicazione OCR per pagina...")
-    
+
     try:
-        images = convert_from_path(pdf_path, dpi=300)
-        
-        testi_ocr = []
-        for i, img in enumerate(images, 1):
-            print(f"    Pagina {i}/{len(images)}")
-            testo = pytesseract.image_to_string(img, lang='ita')
-            testo_pulito = pulisci_testo_ocr(testo)
-            testi_ocr.append(testo_pulito)
-        
+        # Rasterizza su disco invece che in RAM: con paths_only pdftoppm
+        # scrive i JPEG in una cartella temporanea e restituisce solo i
+        # percorsi, così non teniamo in memoria tutte le pagine decodificate
+        with tempfile.TemporaryDirectory(prefix="ocr_pagine_") as tmp_dir:
+            percorsi = convert_from_path(
+                pdf_path,
+                dpi=300,
+                thread_count=os.cpu_count() or 1,
+                fmt='jpeg',
+                output_folder=tmp_dir,
+                paths_only=True
+            )
+
+            # Tesseract è CPU-bound: un processo per pagina satura tutti i core
+            testi_ocr = []
+            with concurrent.futures.ProcessPoolExecutor(max_workers=_numero_worker_ocr()) as executor:
+                for i, testo_pulito in enumerate(executor.map(_ocr_pagina, percorsi), 1):
+                    print(f"    Pagina {i}/{len(percorsi)}")
+                    testi_ocr.append(testo_pulito)
+
         return testi_ocr
-    
+
     except Exception as e:
         print(f"  ✗ Errore OCR: {e}")
         return []
 
+def _ha_speciali_ripetuti(frase):
+    """True se la frase contiene 5+ copie consecutive dello stesso carattere
+    speciale (rumore OCR). Il pattern economico scarta in C le frasi senza
+    nemmeno una coppia doppia - la quasi totalità - e solo per le rare
+    candidate una scansione lineare conferma la lunghezza della sequenza."""
+    m = _RE_SPECIALE_DOPPIO.search(frase)
+    if m is None:
+        return False
+
+    ultimo = ''
+    ripetizioni = 0
+    for c in frase[m.start():]:
+        if c == ultimo:
+            ripetizioni += 1
+            # 4 ripetizioni dopo la prima occorrenza = 5 copie consecutive
+            if ripetizioni >= 4 and not (c.isalnum() or c.isspace() or c == '_'):
+                return True
+        else:
+            ultimo = c
+            ripetizioni = 0
+
+    return False
+
 def is_frase_valida(frase):
     """Verifica se una frase è sensata e non rumore OCR - ottimizzata per contenuto STEM."""
     # Deve avere almeno 2 parole o simboli
@@ -133,60 +307,144 @@ def is_frase_valida(frase):
     if len(parole) < 2:
         return False
     
-    # Conta caratteri validi: alfanumerici + matematici comuni + punteggiatura
-    caratteri_validi = sum(
-        c.isalnum() or 
-        c.isspace() or 
-        c in '.,;:!?()+-*/=<>[]{}^_αβγδεθλμπστφωΣΔΦΩ±×÷≈≠≤≥∞∂∇∫√' 
-        for c in frase
-    )
+    # Conta caratteri validi: alfanumerici + matematici comuni + punteggiatura.
+    # translate elimina i caratteri validi, quindi ciò che resta è il rumore
+    caratteri_validi = len(frase) - len(frase.translate(_TAB_RIMUOVI_VALIDI))
     
     # Almeno 60% di caratteri validi
     if len(frase) > 0 and caratteri_validi / len(frase) < 0.6:
         return False
     
     # Evita solo vero rumore: troppi caratteri speciali ripetuti
-    if re.search(r'([^\w\s])\1{4,}', frase):
+    if _ha_speciali_ripetuti(frase):
         return False
     
     return True
 
+_TERMINATORI_FRASE = '.!?'
+_RE_RUN_TERMINATORI = re.compile(r'[.!?]+')
+
+def _itera_intervalli_frasi(testo):
+    """Genera gli intervalli (inizio, fine, fine_run) delle frasi di un
+    testo: la frase è testo[inizio:fine], i terminatori . ! ? che la
+    chiudono sono testo[fine:fine_run]. Unica scansione in avanti con
+    str.find in C; l'indice della prossima occorrenza di ogni terminatore
+    è tenuto in cache e ricercato solo quando viene superato, così il
+    costo totale resta O(n) anche se un terminatore non compare mai più."""
+    n = len(testo)
+    prossimo = {c: testo.find(c) for c in _TERMINATORI_FRASE}
+    inizio = 0
+
+    while inizio < n:
+        fine = n
+        for c in _TERMINATORI_FRASE:
+            pos = prossimo[c]
+            if -1 < pos < inizio:
+                pos = testo.find(c, inizio)
+                prossimo[c] = pos
+            if pos != -1 and pos < fine:
+                fine = pos
+
+        if fine == n:
+            yield inizio, n, n
+            break
+
+        # Salta l'intera sequenza di terminatori (es. "...", "?!") con un
+        # match compilato: le run lunghe (puntini di sospensione, righe di
+        # puntini negli indici) avanzano in C invece che un carattere alla
+        # volta in Python
+        fine_run = _RE_RUN_TERMINATORI.match(testo, fine).end()
+
+        yield inizio, fine, fine_run
+        inizio = fine_run
+
+def _dividi_in_frasi(testo):
+    """Divide un testo in frasi su . ! ? (terminatori esclusi)."""
+    return [testo[i:j] for i, j, _ in _itera_intervalli_frasi(testo)]
+
+# Forma canonica per il confronto di uguaglianza esatta tra frasi:
+# senza punteggiatura né spazi (le minuscole le applica il chiamante)
+_TAB_IMPRONTA = str.maketrans('', '', string.punctuation + string.whitespace)
+
+def _impronta_frase(frase):
+    """Impronta di una frase per capire se è già presente pari pari."""
+    return frase.translate(_TAB_IMPRONTA)
+
+def _shingles(testo, n=5):
+    """Insieme degli n-grammi di caratteri di una frase, per confronti rapidi."""
+    if len(testo) < n:
+        return frozenset((testo,))
+    return frozenset(testo[i:i + n] for i in range(len(testo) - n + 1))
+
 def trova_frasi_uniche(testo_base, testo_ocr):
     """Trova frasi dall'OCR che non sono nel testo base."""
     if not testo_ocr:
         return []
-    
+
     if not testo_base:
         # Anche se non c'è testo base, filtra solo il vero rumore
-        frasi = re.split(r'[.!?]+', testo_ocr)
+        frasi = _dividi_in_frasi(testo_ocr)
         return [f.strip() for f in frasi if len(f.strip()) > 15 and is_frase_valida(f.strip())]
-    
-    # Dividi in frasi
-    frasi_base = set(re.split(r'[.!?]+', testo_base.lower()))
-    frasi_ocr = re.split(r'[.!?]+', testo_ocr)
-    
+
+    # Dividi in frasi e precalcola gli shingle di ogni frase base:
+    # la similarità Jaccard tra insiemi di n-grammi scarta in O(|set|)
+    # quasi tutti i confronti, senza pagare SequenceMatcher (O(n*m))
+    # su ogni coppia di frasi
+    frasi_base = [f.strip() for f in _dividi_in_frasi(testo_base.lower()) if f.strip()]
+    impronte_base = {_impronta_frase(f) for f in frasi_base}
+    shingle_base = [_shingles(f) for f in frasi_base]
+    frasi_ocr = _dividi_in_frasi(testo_ocr)
+
     frasi_nuove = []
     for frase in frasi_ocr:
         frase_pulita = frase.strip()
-        
+
         # Filtri molto più permissivi per contenuto tecnico
         if not frase_pulita or len(frase_pulita) < 15:
             continue
-        
+
         # Verifica che sia una frase valida (solo contro vero rumore)
         if not is_frase_valida(frase_pulita):
             continue
-        
-        # Verifica se questa frase è già presente nel testo base
+
+        # Duplicato esatto (al netto di punteggiatura e spazi): lookup O(1)
+        # nel set delle impronte, senza alcun confronto di similarità
+        frase_lower = frase_pulita.lower()
+        if _impronta_frase(frase_lower) in impronte_base:
+            continue
+
+        # Altrimenti cerca i quasi-duplicati con gli shingle
+        shingle_ocr = _shingles(frase_lower)
+
+        # Esamina prima le frasi base di lunghezza più vicina: i duplicati
+        # veri hanno quasi sempre lunghezza simile, quindi l'uscita
+        # anticipata scatta dopo pochissimi confronti completi
+        candidate = sorted(
+            zip(frasi_base, shingle_base),
+            key=lambda coppia: abs(len(coppia[0]) - len(frase_lower))
+        )
+
         trovata = False
-        for frase_base in frasi_base:
-            if calcola_similarita(frase_pulita.lower(), frase_base.strip()) > 0.85:
+        for frase_base, sh_base in candidate:
+            jaccard = len(shingle_ocr & sh_base) / len(shingle_ocr | sh_base)
+
+            # Quasi tutti gli shingle coincidono: è un duplicato certo
+            if jaccard >= 0.85:
                 trovata = True
                 break
-        
+
+            # Altrimenti conferma con il confronto completo: la Jaccard
+            # sugli shingle NON è un limite inferiore di ratio (pochi errori
+            # OCR sparsi distruggono fino a 5 shingle ciascuno), quindi non
+            # può scartare da sola. Il confronto resta economico grazie a
+            # score_cutoff/quick_ratio (frasi già in minuscolo)
+            if _similarita_normalizzata(frase_lower, frase_base) > 0.85:
+                trovata = True
+                break
+
         if not trovata:
             frasi_nuove.append(frase_pulita)
-    
+
     return frasi_nuove
 
 def unisci_testo_pagina(testo_nativo, testo_ocr, num_pagina):
@@ -216,9 +474,10 @@ def unisci_testo_pagina(testo_nativo, testo_ocr, num_pagina):
     frasi_nuove = trova_frasi_uniche(testo_nativo, testo_ocr)
     
     if frasi_nuove:
-        testo_aggiuntivo = '. '.join(frasi_nuove)
         print(f"      Pag {num_pagina}: nativo + {len(frasi_nuove)} frasi OCR")
-        return f"{testo_nativo}. {testo_aggiuntivo}"
+        # Un unico join invece di join + f-string: evita di materializzare
+        # due volte il testo della pagina
+        return '. '.join([testo_nativo] + frasi_nuove)
     else:
         print(f"      Pag {num_pagina}: solo nativo (OCR duplicato)")
         return testo_nativo
@@ -226,13 +485,15 @@ def unisci_testo_pagina(testo_nativo, testo_ocr, num_pagina):
 def estrai_testo_completo_pdf(pdf_path):
     """Estrae testo combinando estrazione nativa e OCR pagina per pagina."""
     print(f"  Elaborazione: {pdf_path.name}")
-    
-    # Estrai testo nativo per ogni pagina
-    testi_nativi = estrai_testo_per_pagina_pdf(pdf_path)
-    
-    # Applica OCR per ogni pagina
-    testi_ocr = estrai_testo_ocr_per_pagina(pdf_path)
-    
+
+    # L'estrazione nativa parte in un thread e si sovrappone al rendering
+    # e all'OCR (che girano comunque in processi/sottoprocessi separati),
+    # invece di eseguire le due fasi in serie
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        futuro_nativo = executor.submit(estrai_testo_per_pagina_pdf, pdf_path)
+        testi_ocr = estrai_testo_ocr_per_pagina(pdf_path)
+        testi_nativi = futuro_nativo.result()
+
     # Assicurati che abbiano la stessa lunghezza
     num_pagine = max(len(testi_nativi), len(testi_ocr))
     
@@ -264,47 +525,87 @@ def dividi_per_slide(testi_per_pagina):
     
     return '\n\n'.join(testo_completo)
 
-def dividi_in_blocchi_con_frasi(testo, parole_per_blocco):
-    """Divide il testo in blocchi rispettando i punti delle frasi."""
-    frasi = re.split(r'([.!?]+)', testo)
-    
-    frasi_complete = []
-    for i in range(0, len(frasi) - 1, 2):
-        if i + 1 < len(frasi):
-            frase = frasi[i] + frasi[i + 1]
-            frasi_complete.append(frase.strip())
-    
-    if len(frasi) % 2 == 1 and frasi[-1].strip():
-        frasi_complete.append(frasi[-1].strip())
-    
-    blocchi = []
+def _itera_frasi_con_conteggio(testo):
+    """Genera coppie (frase, numero di parole) con i terminatori attaccati,
+    in un unico passaggio e senza materializzare liste intermedie."""
+    for inizio, _, fine_run in _itera_intervalli_frasi(testo):
+        frase = testo[inizio:fine_run].strip()
+        if frase:
+            yield frase, len(frase.split())
+
+def _itera_blocchi(testo, parole_per_blocco):
+    """Genera i blocchi di testo uno alla volta, rispettando i punti delle
+    frasi: chi scrive su file non deve tenere in memoria tutti i blocchi."""
     blocco_corrente = []
     conteggio_parole = 0
-    
-    for frase in frasi_complete:
-        parole_frase = frase.split()
-        num_parole = len(parole_frase)
-        
+
+    for frase, num_parole in _itera_frasi_con_conteggio(testo):
         if conteggio_parole + num_parole > parole_per_blocco and blocco_corrente:
-            blocchi.append(' '.join(blocco_corrente))
+            yield ' '.join(blocco_corrente)
             blocco_corrente = [frase]
             conteggio_parole = num_parole
         else:
             blocco_corrente.append(frase)
             conteggio_parole += num_parole
-    
+
     if blocco_corrente:
-        blocchi.append(' '.join(blocco_corrente))
-    
-    return '\n\n\n\n\n'.join(blocchi)
+        yield ' '.join(blocco_corrente)
+
+def dividi_in_blocchi_con_frasi(testo, parole_per_blocco):
+    """Divide il testo in blocchi rispettando i punti delle frasi."""
+    return '\n\n\n\n\n'.join(_itera_blocchi(testo, parole_per_blocco))
+
+@functools.lru_cache(maxsize=None)
+def _chiave_naturale(nome):
+    """Chiave di ordinamento naturale per un nome file (cache: Timsort
+    rivaluta la stessa chiave più volte durante i merge)."""
+    parti = _RE_CIFRE.split(nome)
+    return [int(p) if p.isdigit() else p for p in parti]
 
 def ordina_file_naturalmente(files):
     """Ordina i file in modo naturale (1, 2, 10 invece di 1, 10, 2)."""
-    def chiave_naturale(path):
-        parti = re.split(r'(\d+)', path.name.lower())
-        return [int(p) if p.isdigit() else p for p in parti]
-    
-    return sorted(files, key=chiave_naturale)
+    return sorted(files, key=lambda path: _chiave_naturale(path.name.lower()))
+
+def _elabora_singolo_pdf(pdf_file, usa_slide, parole_per_blocco, output_path):
+    """Elabora un singolo PDF e scrive il TXT; restituisce le statistiche.
+    Eseguito in un processo worker: ogni PDF è indipendente dagli altri."""
+    testi_per_pagina = estrai_testo_completo_pdf(pdf_file)
+
+    if not testi_per_pagina:
+        return None
+
+    output_filepath = output_path / (pdf_file.stem + ".txt")
+
+    # Scrittura in streaming con buffer ampio: i blocchi vanno su disco man
+    # mano che vengono generati, senza mai materializzare l'intero TXT
+    with open(output_filepath, 'w', encoding='utf-8', buffering=1 << 20) as f:
+        if usa_slide:
+            # Modalità slide separate
+            f.write(dividi_per_slide(testi_per_pagina))
+            num_parole = sum(len(t.split()) for t in testi_per_pagina)
+            num_unita = len(testi_per_pagina)
+            tipo_unita = "slide"
+        else:
+            # Modalità blocchi di parole
+            testo_unito = ' '.join(testi_per_pagina)
+            num_parole = len(testo_unito.split())
+            num_unita = 0
+
+            for blocco in _itera_blocchi(testo_unito, parole_per_blocco):
+                if num_unita:
+                    f.write('\n\n\n\n\n')
+                f.write(blocco)
+                num_unita += 1
+
+            tipo_unita = "blocchi"
+
+    return {
+        'nome': pdf_file.name,
+        'file_txt': output_filepath.name,
+        'parole': num_parole,
+        'unita': num_unita,
+        'tipo': tipo_unita
+    }
 
 def elabora_cartella(cartella, output_folder="output_txt"):
     """Elabora tutti i PDF in una cartella e crea file TXT separati."""
@@ -354,46 +655,41 @@ def elabora_cartella(cartella, output_folder="output_txt"):
         else:
             print("Errore: scegli 1 o 2.")
     
-    statistiche = []
-    
-    for idx, pdf_file in enumerate(pdf_files, 1):
-        print(f"\n[{idx}/{len(pdf_files)}] {pdf_file.name}")
-        print("="*70)
-        
-        testi_per_pagina = estrai_testo_completo_pdf(pdf_file)
-        
-        if testi_per_pagina and len(testi_per_pagina) > 0:
-            if usa_slide:
-                # Modalità slide separate
-                testo_formattato = dividi_per_slide(testi_per_pagina)
-                num_parole = sum(len(t.split()) for t in testi_per_pagina)
-                num_unita = len(testi_per_pagina)
-                tipo_unita = "slide"
+    # I PDF sono indipendenti: metà dei core al parallelismo tra PDF, il
+    # resto all'OCR interno a ciascun PDF (via OCR_CONCURRENCY), così i
+    # due livelli non si sommano oltre il numero di core disponibili
+    num_core = os.cpu_count() or 1
+    worker_pdf = min(len(pdf_files), max(1, num_core // 2))
+    os.environ.setdefault('OCR_CONCURRENCY', str(max(1, num_core // worker_pdf)))
+
+    statistiche_per_file = {}
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=worker_pdf) as executor:
+        futuri = {
+            executor.submit(_elabora_singolo_pdf, pdf_file, usa_slide, parole_per_blocco, output_path): pdf_file
+            for pdf_file in pdf_files
+        }
+
+        for idx, futuro in enumerate(concurrent.futures.as_completed(futuri), 1):
+            pdf_file = futuri[futuro]
+            print(f"\n[{idx}/{len(pdf_files)}] {pdf_file.name}")
+            print("="*70)
+
+            try:
+                stat = futuro.result()
+            except Exception as e:
+                print(f"  ✗ Errore elaborazione: {e}")
+                continue
+
+            if stat:
+                statistiche_per_file[pdf_file] = stat
+                print(f"  ✓ Salvato: {stat['file_txt']} ({stat['parole']:,} parole, {stat['unita']} {stat['tipo']})")
             else:
-                # Modalità blocchi di parole
-                testo_unito = ' '.join(testi_per_pagina)
-                testo_formattato = dividi_in_blocchi_con_frasi(testo_unito, parole_per_blocco)
-                num_parole = len(testo_unito.split())
-                num_unita = len(testo_formattato.split('\n\n\n\n\n'))
-                tipo_unita = "blocchi"
-            
-            output_filename = pdf_file.stem + ".txt"
-            output_filepath = output_path / output_filename
-            
-            with open(output_filepath, 'w', encoding='utf-8') as f:
-                f.write(testo_formattato)
-            
-            statistiche.append({
-                'nome': pdf_file.name,
-                'parole': num_parole,
-                'unita': num_unita,
-                'tipo': tipo_unita
-            })
-            
-            print(f"  ✓ Salvato: {output_filename} ({num_parole:,} parole, {num_unita} {tipo_unita})")
-        else:
-            print(f"  ✗ Nessun testo estratto")
-    
+                print(f"  ✗ Nessun testo estratto")
+
+    # Riepilogo nell'ordine naturale dei file, non di completamento
+    statistiche = [statistiche_per_file[p] for p in pdf_files if p in statistiche_per_file]
+
     print(f"\n{'='*70}")
     print(f"RIEPILOGO FINALE:")
     print(f"{'='*70}")